@@ -36,6 +36,7 @@ import time as _time
 
 from . import LOG as _LOG
 from . import error as _error
+from . import feed as _feed
 
 def new(feeds, args):
     "Create a new feed database."
@@ -74,6 +75,28 @@ def run(feeds, args):
         # How long (in seconds) to sleep between running feeds with
         # the same server.
         interval = float(feeds.config['DEFAULT']['same-server-fetch-interval'])
+        workers = int(feeds.config['DEFAULT']['fetch-workers'])
+
+        if workers > 1 and interval <= 0 and not args.clean:
+            # Fetch concurrently; process and send serially as each
+            # fetch completes.
+            selected = []
+            for index in args.index:
+                feed = feeds.index(index)
+                # to debug feeds that timeout, run "r2e -VV run"
+                _LOG.info('refreshing feed {}'.format(feed))
+                if feed.active:
+                    selected.append(feed)
+            use_processes = feeds.config['DEFAULT'].getboolean(
+                'use-process-pool')
+            for feed, parsed in _feed.Feed.fetch_many(
+                    selected, max_workers=workers,
+                    use_processes=use_processes):
+                try:
+                    feed.run(send=args.send, parsed=parsed)
+                except _error.RSS2EmailError as e:
+                    e.log()
+            return
 
         # We use the domain name to determine if we are fetching from
         # the same server twice in a row.
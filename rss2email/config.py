@@ -49,7 +49,6 @@
 import collections as _collections
 import configparser as _configparser
 
-import html2text as _html2text
 
 class Config (_configparser.ConfigParser):
     def __init__(self, dict_type=_collections.OrderedDict,
@@ -64,6 +63,7 @@ class Config (_configparser.ConfigParser):
         Html2text unfortunately uses globals (instead of keyword
         arguments) to configure its conversion.
         """
+        import html2text as _html2text  # deferred; only needed for conversion
         if section not in self:
             section = 'DEFAULT'
         _html2text.config.UNICODE_SNOB = self.getboolean(
@@ -114,6 +114,14 @@ CONFIG['DEFAULT'] = _collections.OrderedDict((
         ('feed-timeout', str(60)),
         # Set the time (in seconds) to sleep between fetches from the same server
         ('same-server-fetch-interval', str(0)),
+        # Number of worker threads used to fetch feeds concurrently.
+        # Set to 1 for the old serial behavior.  Fetches are serial
+        # regardless whenever same-server-fetch-interval is non-zero.
+        ('fetch-workers', str(8)),
+        # True: Fetch and parse feeds in worker processes so the
+        # CPU-bound XML parsing uses multiple cores.
+        # False: Fetch in threads (parsing shares one core).
+        ('use-process-pool', str(False)),
         # Custom HTTP headers (newline separated)
         ('http-header', ''),
 
@@ -147,6 +155,10 @@ CONFIG['DEFAULT'] = _collections.OrderedDict((
         # If 'trust-guid' or 'trust-link' is True, this setting allows to receive
         # a new email message in reply to the previous one when the post changes.
         ('reply-changes', str(False)),
+        # Maximum number of seen entries remembered per feed; the
+        # oldest entries are evicted beyond this.  Set to 0 to remember
+        # every entry forever.
+        ('max-seen', str(10000)),
         # To most correctly encode emails with international
         # characters, we iterate through the list below and use the
         # first character set that works.
@@ -56,8 +56,6 @@ import sys as _sys
 import time as _time
 import os as _os
 
-import html2text
-
 from . import LOG as _LOG
 from . import config as _config
 from . import error as _error
@@ -85,6 +83,7 @@ def guess_encoding(string, encodings=('US-ASCII', 'UTF-8')):
     raise _error.NoValidEncodingError(string=string, encodings=encodings)
 
 def _add_plain_multipart(guid: str, message, html: str):
+    import html2text  # deferred; only needed for multipart conversion
     headers = message.items()
     msg = MIMEMultipart('alternative')
     for name, value in headers:
@@ -30,7 +30,6 @@ from . import __version__, __url__, __email__
 import pprint as _pprint
 
 import feedparser as _feedparser
-import html2text as _html2text
 
 
 class RSS2EmailError (Exception):
@@ -178,6 +177,7 @@ class ProcessingError (FeedError):
 
     def log(self):
         super(ProcessingError, self).log()
+        import html2text as _html2text  # deferred; only needed for the report
         if type(self) == ProcessingError:  # not a more specific subclass
             _LOG.warning(
                 '=== rss2email encountered a problem with this feed ===')
@@ -50,29 +50,28 @@
 """Define the ``Feed`` class for handling a single feed
 """
 
-import calendar as _calendar
 import collections as _collections
+import concurrent.futures as _futures
 import platform
 from email.message import Message
 from email.mime.message import MIMEMessage as _MIMEMessage
 from email.mime.multipart import MIMEMultipart as _MIMEMultipart
 from email.utils import formataddr as _formataddr
-from email.utils import formatdate as _formatdate
 from email.utils import parseaddr as _parseaddr
 import hashlib as _hashlib
 import html.parser as _html_parser
+import itertools as _itertools
+import os as _os
+import pickle as _pickle
 import re as _re
 import socket as _socket
 import time as _time
 import urllib.request as _urllib_request
 import uuid as _uuid
 import xml.sax as _sax
-import xml.sax.saxutils as _saxutils
-from functools import lru_cache
 from typing import Optional, Dict, Any, Tuple
 
 import feedparser as _feedparser
-import html2text as _html2text
 import html as _html
 
 from . import __url__
@@ -94,7 +93,91 @@ _SOCKET_ERRORS = tuple(_SOCKET_ERRORS)
 
 # drv_libxml2 raises:
 #   TypeError: 'str' does not support the buffer interface
-_feedparser.PREFERRED_XML_PARSERS = []
+# feedparser 6 reads this list from feedparser.api, so setting it on
+# the package no longer has any effect.  Pointing the strict parser
+# straight at expat also skips a doomed drv_libxml2 import attempt on
+# every parse; the C expat path handles well-formed feeds, with
+# feedparser's loose parser as the tag-soup fallback.
+_feedparser.api.PREFERRED_XML_PARSERS = []
+
+# constant HTML scaffolding shared by every rendered entry
+_HTML_HEAD = (
+    '<!DOCTYPE html>',
+    '<html>',
+    '  <head>',
+    )
+
+_HTML_FOOT = (
+    '</div>',  # /footer
+    '</div>',  # /entry
+    '</body>',
+    '</html>',
+    '',
+    )
+
+
+_DAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _format_rfc2822_date(st):
+    """Format a UTC struct_time as an RFC 2822 date string.
+
+    Equivalent to ``email.utils.formatdate(calendar.timegm(st))``, but
+    formats the struct_time fields directly instead of round-tripping
+    through an epoch timestamp, and never consults the locale.
+    """
+    return (
+        f'{_DAYS[st.tm_wday]}, {st.tm_mday:02d} {_MONTHS[st.tm_mon - 1]} '
+        f'{st.tm_year:04d} {st.tm_hour:02d}:{st.tm_min:02d}:{st.tm_sec:02d} '
+        '-0000')
+
+
+_MESSAGE_ID_COUNTER = _itertools.count()
+_MESSAGE_ID_NODE = _uuid.getnode()
+
+
+def _get_message_id():
+    """Return a unique RFC 5322 Message-ID.
+
+    A millisecond timestamp, a per-process counter, the process id, and
+    the hardware address together guarantee uniqueness without drawing
+    on the kernel's entropy pool for every message the way ``uuid4``
+    does.
+    """
+    return '<{:x}.{:x}.{:x}.{:x}@{}>'.format(
+        int(_time.time() * 1000), next(_MESSAGE_ID_COUNTER),
+        _os.getpid(), _MESSAGE_ID_NODE, platform.node())
+
+
+def _parse_feed(url, etag, modified, agent, proxy, request_headers, timeout):
+    """Fetch and parse one feed in a process-pool worker.
+
+    Module-level (not a method) so the call and its arguments stay
+    picklable; feedparser's own HTTP handling is reused, so conditional
+    GETs and local files behave exactly as in ``Feed._fetch``.  The
+    timeout is applied per socket operation via
+    ``socket.setdefaulttimeout`` since ``TimeLimitedFunction`` threads
+    don't cross the process boundary.
+    """
+    _socket.setdefaulttimeout(timeout)
+    kwargs = {'request_headers': request_headers}
+    if proxy:
+        kwargs['handlers'] = [
+            _urllib_request.ProxyHandler({ 'http': proxy, 'https': proxy })
+        ]
+    parsed = _feedparser.parse(
+        url, etag, modified=modified, agent=agent, **kwargs)
+    exc = parsed.get('bozo_exception', None)
+    if exc is not None:
+        try:
+            _pickle.dumps(exc)
+        except Exception:
+            # keep at least the message when the exception itself
+            # can't cross the process boundary
+            parsed['bozo_exception'] = Exception(str(exc))
+    return parsed
 
 
 class Feed (object):
@@ -164,6 +247,8 @@ class Feed (object):
 
     """
     _name_regexp = _re.compile(r'^[\w\d.-]+$')
+    # exactly one '@' with non-empty, whitespace-free parts either side
+    _email_regexp = _re.compile(r'^[^@\s]+@[^@\s]+$')
 
     # saved/loaded from feed.dat using __getstate__/__setstate__.
     _dynamic_attributes = [
@@ -203,8 +288,9 @@ class Feed (object):
     _configured_attribute_inverse_translations = dict(
         (v,k) for k,v in _configured_attribute_translations.items())
 
-    # hints for value conversion
-    _boolean_attributes = [
+    # hints for value conversion (frozensets: these are membership
+    # tests run for every configured key on every feed load)
+    _boolean_attributes = frozenset([
         'digest',
         'force_from',
         'use_publisher_email',
@@ -219,22 +305,34 @@ class Feed (object):
         'links_after_each_paragraph',
         'use_smtp',
         'smtp_ssl',
-        ]
+        'use_process_pool',
+        ])
 
-    _integer_attributes = [
+    _integer_attributes = frozenset([
         'feed_timeout',
+        'fetch_workers',
         'body_width',
-        ]
+        'max_seen',
+        ])
 
-    _list_attributes = [
+    _list_attributes = frozenset([
         'date_header_order',
         'encodings',
-        ]
+        ])
 
-    _function_attributes = [
+    _function_attributes = frozenset([
         'post_process',
         'digest_post_process',
-        ]
+        ])
+
+    # Slot descriptors for the known attributes: smaller instances and
+    # C-level attribute access for the per-entry hot paths.  '__dict__'
+    # stays available for ad-hoc attributes (e.g. tests replacing
+    # `_send`), but is only materialized when actually used.
+    __slots__ = tuple(
+        _configured_attributes + _dynamic_attributes +
+        ['config', 'section', '_effective_section',
+         '_entry_content_cache', '_entry_hash_cache', '__dict__'])
 
     @property
     def user_agent(self):
@@ -280,7 +378,13 @@ class Feed (object):
         if keys != sorted(self._dynamic_attributes):
             raise ValueError(state)
         self._set_name(name=state['name'])
-        self.__dict__.update(state)
+        # JSON deserialization returns a plain dict
+        state['seen'] = _collections.OrderedDict(state['seen'])
+        for key,value in state.items():
+            setattr(self, key, value)
+        # one-slot (entry, result) caches for the per-entry accessors
+        self._entry_content_cache = None
+        self._entry_hash_cache = None
 
     set_state = __setstate__  # make it publicly accessible
 
@@ -298,6 +402,7 @@ class Feed (object):
                     value != default[key]):
                     data[key] = value
         self.config[self.section] = data
+        self._effective_section = self.section
 
     def load_from_config(self, config=None):
         "Restore configured attributes"
@@ -322,16 +427,21 @@ class Feed (object):
                     raise _error.InvalidFeedConfig(
                         setting=key, feed=self,
                         message='extra configuration key: {}'.format(key))
-        data = dict(
-            (self._configured_attribute_inverse_translations[k],
-             self._get_configured_attribute_value(
-                  attribute=self._configured_attribute_inverse_translations[k],
-                  key=k, data=data))
-            for k in data.keys())
+        inverse = self._configured_attribute_inverse_translations
+        get_value = self._get_configured_attribute_value
+        translated = {}
+        for key in data.keys():
+            attr = inverse[key]
+            translated[attr] = get_value(attribute=attr, key=key, data=data)
+        data = translated
         for attr in self._non_default_configured_attributes:
             if attr not in data:
                 data[attr] = None
-        self.__dict__.update(data)
+        for attr,value in data.items():
+            setattr(self, attr, value)
+        # resolved once so per-run code skips the section lookup
+        self._effective_section = (
+            self.section if self.section in self.config else 'DEFAULT')
 
     def _get_configured_option_value(self, attribute, value):
         if value is None:
@@ -360,7 +470,9 @@ class Feed (object):
         """
         self.etag = None
         self.modified = None
-        self.seen = {} # type: Dict[str, Dict[str, Any]]
+        # ordered oldest to newest so the max-seen cap can evict the
+        # oldest entries first
+        self.seen = _collections.OrderedDict() # type: Dict[str, Dict[str, Any]]
 
     def _set_name(self, name):
         if not self._name_regexp.match(name):
@@ -368,6 +480,25 @@ class Feed (object):
         self.name = name
         self.section = 'feed.{}'.format(self.name)
 
+    def _request_headers(self):
+        "Extra HTTP headers from the http-header setting."
+        extra_headers = {}
+        if self.http_header:
+            for header in self.http_header.splitlines():
+                if ':' in header:
+                    key,value = header.split(':', 1)
+                    extra_headers[key.strip()] = value.strip()
+                else:
+                    _LOG.warning('malformed http-header: %s', self.http_header)
+        return extra_headers
+
+    def _fetch_args(self):
+        "Picklable arguments for _parse_feed, mirroring _fetch."
+        if not self.url:
+            raise _error.InvalidFeedConfig(setting='url', feed=self)
+        return (self.url, self.etag, self.modified, self.http_user_agent,
+                self.proxy, self._request_headers(), self.feed_timeout)
+
     def _fetch(self):
         """Fetch and parse a feed using feedparser.
 
@@ -378,38 +509,95 @@ class Feed (object):
         >>> parsed.status
         200
         """
-        _LOG.info('fetch {}'.format(self))
+        _LOG.info('fetch %s', self)
         if not self.url:
             raise _error.InvalidFeedConfig(setting='url', feed=self)
-        if self.section in self.config:
-            config = self.config[self.section]
-        else:
-            config = self.config['DEFAULT']
-        proxy = config['proxy']
-        timeout = config.getint('feed-timeout')
+        # proxy, feed_timeout, and http_header were already typed and
+        # loaded from the configuration in load_from_config(); reading
+        # them as attributes skips configparser's section lookup and
+        # coercion on every fetch.
+        proxy = self.proxy
         kwargs = {}
         if proxy:
             kwargs['handlers'] = [
                 _urllib_request.ProxyHandler({ 'http': proxy, 'https': proxy })
             ]
-        extra_headers = {}
-        custom_headers = config['http-header']
-        if custom_headers:
-            for header in self.http_header.splitlines():
-                if ':' in header:
-                    key,value = header.split(':', 1)
-                    extra_headers[key.strip()] = value.strip()
-                else:
-                    _LOG.warning('malformed http-header: {}'.format(self.bonus_header))
-        kwargs['request_headers'] = extra_headers
-        f = _util.TimeLimitedFunction('feed {}'.format(self.name), timeout, _feedparser.parse)
+        kwargs['request_headers'] = self._request_headers()
+        f = _util.TimeLimitedFunction(
+            'feed {}'.format(self.name), self.feed_timeout, _feedparser.parse)
         return f(self.url, self.etag, modified=self.modified, agent=self.http_user_agent, **kwargs)
 
-    def _process(self, parsed):
-        _LOG.info('process {}'.format(self))
+    @classmethod
+    def fetch_many(cls, feeds, max_workers=8, use_processes=False):
+        """Fetch several feeds concurrently, yielding ``(feed, parsed)`` pairs.
+
+        Fetching is I/O-bound, so ``_fetch`` calls are dispatched to a
+        thread pool while processing and sending stay on the caller's
+        thread (keeping ``seen`` and configuration mutation
+        single-threaded).  With `use_processes`, fetch and parse run in
+        worker processes instead, so the pure-Python XML parsing also
+        scales across cores rather than serializing on the GIL.  Pairs
+        are yielded as each fetch completes, not in the order of
+        `feeds`.  Fetch errors are logged and the affected feed is
+        skipped, matching the serial behavior.
+        """
+        if use_processes:
+            executor = _futures.ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            executor = _futures.ThreadPoolExecutor(max_workers=max_workers)
+        with executor:
+            jobs = {}
+            for feed in feeds:
+                try:
+                    if use_processes:
+                        job = executor.submit(_parse_feed, *feed._fetch_args())
+                    else:
+                        job = executor.submit(feed._fetch)
+                except _error.RSS2EmailError as e:
+                    e.log()
+                    continue
+                jobs[job] = feed
+            for job in _futures.as_completed(jobs):
+                feed = jobs[job]
+                try:
+                    parsed = job.result()
+                except _error.RSS2EmailError as e:
+                    e.log()
+                    continue
+                yield feed, parsed
+
+    # how many consecutive already-seen entries mark the start of the
+    # known (older) tail of a feed
+    _seen_run_length = 3
+
+    def _process(self, parsed, full=False):
+        _LOG.info('process %s', self)
+        if getattr(parsed, 'status', 200) == 304:
+            # The server says nothing changed since our conditional GET
+            # (ETag/Last-Modified), so skip the per-entry work entirely.
+            _LOG.debug('feed not modified (HTTP 304): %s', self)
+            return
         self._check_for_errors(parsed)
-        for entry in reversed(parsed.entries):
-            _LOG.debug('processing {}'.format(entry.get('id', 'no-id')))
+        entries = parsed.entries
+        if not full and not self.reply_changes:
+            # Feeds prepend new entries, so in the steady state the
+            # head of the list holds the few new entries and the rest
+            # is already seen.  Scan forward and stop at a run of seen
+            # entries instead of walking the whole history.  Changed
+            # entries (reply-changes) and clean runs need a full scan.
+            fresh = []
+            run = 0
+            for entry in entries:
+                if self._get_uid_for_entry(entry) in self.seen:
+                    run += 1
+                    if run >= self._seen_run_length:
+                        break
+                else:
+                    run = 0
+                    fresh.append(entry)
+            entries = fresh
+        for entry in reversed(entries):
+            _LOG.debug('processing %s', entry.get('id', 'no-id'))
             processed = self._process_entry(parsed=parsed, entry=entry)
             if processed:
                 guid, _, sender, message = processed
@@ -421,72 +609,99 @@ class Feed (object):
                         continue
                 yield processed
 
+    def _log_timeout_error(self, exc):
+        _LOG.error('timed out: %s', self)
+        return True
+
+    def _log_compression_error(self, exc):
+        _LOG.error('broken compression: %s', self)
+        return True
+
+    def _log_sax_error(self, exc):
+        _LOG.error('sax parsing error: %s: %s', exc, self)
+        return True
+
+    # exact bozo_exception type -> handler; consulted before the
+    # isinstance chain in _check_for_errors so the common error types
+    # dispatch with a single dict lookup.  Subclasses (and the types
+    # whose handling depends on parsed.bozo) still take the chain.
+    _exception_handlers = {
+        _socket.timeout: _log_timeout_error,
+        _feedparser.http.zlib.error: _log_compression_error,
+        _sax.SAXParseException: _log_sax_error,
+        }
+
     def _check_for_errors(self, parsed):
         warned = False
         status = getattr(parsed, 'status', 200)
-        _LOG.debug('HTTP status {}'.format(status))
+        _LOG.debug('HTTP status %s', status)
         if status == 301:
-            _LOG.info('redirect {} from {} to {}'.format(
-                    self.name, self.url, parsed['url']))
+            _LOG.info('redirect %s from %s to %s',
+                    self.name, self.url, parsed['url'])
             self.url = parsed['url']
         elif status not in [200, 302, 304, 307]:
             raise _error.HTTPError(status=status, feed=self)
 
         http_headers = parsed.get('headers', {})
         if http_headers:
-            _LOG.debug('HTTP headers: {}'.format(http_headers))
+            _LOG.debug('HTTP headers: %s', http_headers)
             http_headers = dict((k.lower(), v) for k, v in http_headers.items())
         if not http_headers:
-            _LOG.warning('could not get HTTP headers: {}'.format(self))
+            _LOG.warning('could not get HTTP headers: %s', self)
             warned = True
         else:
             if 'html' in http_headers.get('content-type', 'rss'):
-                _LOG.warning('looks like HTML: {}'.format(self))
+                _LOG.warning('looks like HTML: %s', self)
                 warned = True
             if http_headers.get('content-length', '1') == '0':
-                _LOG.warning('empty page: {}'.format(self))
+                _LOG.warning('empty page: %s', self)
                 warned = True
 
         version = parsed.get('version', None)
         if version:
-            _LOG.debug('feed version {}'.format(version))
+            _LOG.debug('feed version %s', version)
         else:
-            _LOG.debug('unrecognized version: {}'.format(self))
+            _LOG.debug('unrecognized version: %s', self)
             warned = True
 
         exc = parsed.get('bozo_exception', None)
-        if isinstance(exc, _socket.timeout):
-            _LOG.error('timed out: {}'.format(self))
+        handler = (
+            self._exception_handlers.get(type(exc))
+            if exc is not None else None)
+        if handler is not None:
+            warned = handler(self, exc) or warned
+        elif isinstance(exc, _socket.timeout):
+            _LOG.error('timed out: %s', self)
             warned = True
         elif isinstance(exc, OSError):
-            _LOG.error('{}: {}'.format(exc, self))
+            _LOG.error('%s: %s', exc, self)
             warned = True
         elif isinstance(exc, _SOCKET_ERRORS):
-            _LOG.error('{}: {}'.format(exc, self))
+            _LOG.error('%s: %s', exc, self)
             warned = True
         elif isinstance(exc, _feedparser.http.zlib.error):
-            _LOG.error('broken compression: {}'.format(self))
+            _LOG.error('broken compression: %s', self)
             warned = True
         elif isinstance(exc, (IOError, AttributeError)):
-            _LOG.error('{}: {}'.format(exc, self))
+            _LOG.error('%s: %s', exc, self)
             warned = True
         elif isinstance(exc, KeyboardInterrupt):
             raise exc
         elif isinstance(exc, _sax.SAXParseException):
-            _LOG.error('sax parsing error: {}: {}'.format(exc, self))
+            _LOG.error('sax parsing error: %s: %s', exc, self)
             warned = True
         elif (parsed.bozo and
               isinstance(exc, _feedparser.CharacterEncodingOverride)):
             _LOG.warning(
-                'incorrectly declared encoding: {}: {}'.format(exc, self))
+                'incorrectly declared encoding: %s: %s', exc, self)
             warned = True
         elif (parsed.bozo and isinstance(exc, _feedparser.NonXMLContentType)):
-            _LOG.warning('non XML Content-Type: {}: {}'.format(exc, self))
+            _LOG.warning('non XML Content-Type: %s: %s', exc, self)
             warned = True
         elif parsed.bozo or exc:
             if exc is None:
                 exc = "can't process"
-            _LOG.error('processing error: {}: {}'.format(exc, self))
+            _LOG.error('processing error: %s: %s', exc, self)
             warned = True
 
         if (not warned and
@@ -496,6 +711,7 @@ class Feed (object):
             raise _error.ProcessingError(parsed=parsed, feed=self)
 
     def _html2text(self, html, baseurl='', default=None):
+        import html2text as _html2text  # deferred; regex-heavy module
         self.config.setup_html2text(section=self.section)
         try:
             return _html2text.html2text(html=html, baseurl=baseurl)
@@ -510,15 +726,15 @@ class Feed (object):
 
         old_state = self.seen.get(guid)
         if old_state is None:
-            _LOG.debug('not seen {}'.format(guid))
+            _LOG.debug('not seen %s', guid)
             new_state = {} # type: Dict[str, Any]
         else:
-            _LOG.debug('already seen {}'.format(guid))
+            _LOG.debug('already seen %s', guid)
             if 'old' in old_state:
                 del old_state['old']
             if self.reply_changes:
                 if new_hash != old_state.get('hash'):
-                    _LOG.debug('hash changed for {}'.format(guid))
+                    _LOG.debug('hash changed for %s', guid)
                     new_state = old_state.copy()
                 else:
                     return None
@@ -530,9 +746,13 @@ class Feed (object):
         sender = self._get_entry_email(parsed=parsed, entry=entry)
         subject = self._get_entry_subject(entry=entry)
 
-        message_id = '<{0}@{1}>'.format(_uuid.uuid4(), platform.node())
+        message_id = _get_message_id()
         in_reply_to = old_state.get('message_id') if old_state is not None else None
-        extra_headers = _collections.OrderedDict((
+        # plain dicts preserve insertion order; empty tags, etc. are
+        # filtered out as the headers are assembled
+        extra_headers = {
+            key: value
+            for key,value in (
                 ('Date', self._get_entry_date(entry)),
                 ('Message-ID', message_id),
                 ('In-Reply-To', in_reply_to),
@@ -543,11 +763,8 @@ class Feed (object):
                 ('X-RSS-ID', guid),
                 ('X-RSS-URL', self._get_entry_link(entry)),
                 ('X-RSS-TAGS', self._get_entry_tags(entry)),
-                ))
-        # remove empty tags, etc.
-        keys = {k for k, v in extra_headers.items() if v is None}
-        for key in keys:
-            extra_headers.pop(key)
+                )
+            if value is not None}
         if self.bonus_header:
             for header in self.bonus_header.splitlines():
                 if ':' in header:
@@ -555,8 +772,7 @@ class Feed (object):
                     extra_headers[key.strip()] = value.strip()
                 else:
                     _LOG.warning(
-                        'malformed bonus-header: {}'.format(
-                            self.bonus_header))
+                        'malformed bonus-header: %s', self.bonus_header)
 
         content = self._get_entry_content(entry)
         try:
@@ -589,8 +805,10 @@ class Feed (object):
                 return uid
         return self._get_entry_hash(entry)
 
-    @lru_cache(1)
     def _get_entry_hash(self, entry) -> str:
+        cached = self._entry_hash_cache
+        if cached is not None and cached[0] is entry:
+            return cached[1]
         content = self._get_entry_content(entry)
         content_value = content['value'].strip()
         if content_value:
@@ -601,7 +819,10 @@ class Feed (object):
             text = entry.title
         else:
             text = ""
-        return _hashlib.sha1(text.encode('unicode-escape')).hexdigest()
+        digest = _hashlib.blake2b(
+            text.encode('utf-8'), digest_size=16).hexdigest()
+        self._entry_hash_cache = (entry, digest)
+        return digest
 
     def _get_entry_id(self, entry) -> Optional[str]:
         id_ = getattr(entry, 'id', None)
@@ -614,14 +835,19 @@ class Feed (object):
         return entry.get('link', None)
 
     def _get_entry_title(self, entry):
+        # feeds routinely declare plain-text titles as HTML; without
+        # tags or entities the conversion is the identity, so only pay
+        # for html2text when there is markup to convert
         if hasattr(entry, 'title_detail') and entry.title_detail:
             title = entry.title_detail.value
-            if 'html' in entry.title_detail.type:
+            if 'html' in entry.title_detail.type and (
+                    '<' in title or '&' in title):
                 title = self._html2text(title, default=title)
         else:
             content = self._get_entry_content(entry)
             value = content['value']
-            if content['type'] in ('text/html', 'application/xhtml+xml'):
+            if content['type'] in ('text/html', 'application/xhtml+xml') and (
+                    '<' in value or '&' in value):
                 value = self._html2text(value, default=value)
             title = value[:70]
         title = title.replace('\n', ' ').strip()
@@ -635,7 +861,7 @@ class Feed (object):
                 if entry.get(kind, None):
                     datetime = entry[kind]
                     break
-        return _formatdate(_calendar.timegm(datetime))
+        return _format_rfc2822_date(datetime)
 
     def _get_entry_name(self, parsed, entry):
         """Get the best name
@@ -717,12 +943,11 @@ class Feed (object):
         >>> f._validate_email('invalid', 'default@example.com')
         'default@example.com'
         """
-        parts = email.split('@')
-        if len(parts) != 2 or '' in parts:
-            if default is None:
-                return self.from_email
-            return default
-        return email
+        if self._email_regexp.match(email):
+            return email
+        if default is None:
+            return self.from_email
+        return default
 
     def _get_entry_address(self, parsed, entry):
         """Get the best From email address ('<jdoe@a.com>')
@@ -796,12 +1021,22 @@ class Feed (object):
         if taglist:
             return ','.join(taglist)
 
-    @lru_cache(1)
     def _get_entry_content(self, entry):
         """Select the best content from an entry.
 
-        Returns a feedparser content dict.
+        Returns a feedparser content dict.  The selection for the
+        current entry is cached, since the id, hash, title, and body
+        code paths each ask for it.
         """
+        cached = self._entry_content_cache
+        if cached is not None and cached[0] is entry:
+            return cached[1]
+        content = self._select_entry_content(entry)
+        self._entry_content_cache = (entry, content)
+        return content
+
+    def _select_entry_content(self, entry):
+        "Pick the best of an entry's content alternatives."
         # How this works:
         #  * We have a bunch of potential contents.
         #  * We go thru looking for our first choice.
@@ -831,16 +1066,16 @@ class Feed (object):
     def _process_entry_content(self, entry, content, subject):
         "Convert entry content to the requested format."
         link = self._get_entry_link(entry)
+        ctype = content['type']
         if self.html_mail:
-            lines = [
-                '<!DOCTYPE html>',
-                '<html>',
-                '  <head>',
-                ]
+            # deferred import, hoisted to a local; called many times
+            # per entry
+            from xml.sax.saxutils import escape
+            lines = list(_HTML_HEAD)
             if self.use_css and self.css:
                 lines.extend([
                         '    <style type="text/css">',
-                        _saxutils.escape(self.css),
+                        escape(self.css),
                         '    </style>',
                         ])
             # For backward compatibility, specify "body" and "entry"
@@ -853,48 +1088,41 @@ class Feed (object):
                     '<body dir="auto">',
                     '<div class="entry" id="entry">',
                     '<h1 class="header"><a href="{}">{}</a></h1>'.format(
-                        _saxutils.escape(link) if link else '',
-                        _saxutils.escape(subject)),
+                        escape(link) if link else '',
+                        escape(subject)),
                     '<div class="body" id="body">',
                     ])
-            if content['type'] in ('text/html', 'application/xhtml+xml'):
+            if ctype in ('text/html', 'application/xhtml+xml'):
                 lines.append(content['value'].strip())
             else:
-                lines.append(_saxutils.escape(content['value'].strip()))
+                lines.append(escape(content['value'].strip()))
             lines.append('</div>')
             lines.append('<div class="footer">')
             if link:
-                lines.append(
-                    '<p>URL: <a href="{0}">{0}</a></p>'.format(
-                        _saxutils.escape(link)))
+                url = escape(link)
+                lines.append(f'<p>URL: <a href="{url}">{url}</a></p>')
             for enclosure in getattr(entry, 'enclosures', []):
                 if getattr(enclosure, 'url', None):
+                    url = escape(enclosure.url)
                     lines.append(
-                        '<p>Enclosure: <a href="{0}">{0}</a></p>'.format(
-                            _saxutils.escape(enclosure.url)))
+                        f'<p>Enclosure: <a href="{url}">{url}</a></p>')
                 if getattr(enclosure, 'src', None):
+                    src = escape(enclosure.src)
                     lines.append(
-                        '<p>Enclosure: <a href="{0}">{0}</a></p>'.format(
-                            _saxutils.escape(enclosure.src)))
-                    lines.append(
-                        '<p><img src="{}" /></p>'.format(_saxutils.escape(enclosure.src)))
+                        f'<p>Enclosure: <a href="{src}">{src}</a></p>')
+                    lines.append(f'<p><img src="{src}" /></p>')
             for elink in getattr(entry, 'links', []):
                 if elink.get('rel', None) == 'via':
                     url = elink['href']
-                    title = elink.get('title', url)
-                    lines.append('<p>Via <a href="{}">{}</a></p>'.format(
-                            _saxutils.escape(url), _saxutils.escape(title)))
-            lines.extend([
-                    '</div>',  # /footer
-                    '</div>',  # /entry
-                    '</body>',
-                    '</html>',
-                    ''])
+                    title = escape(elink.get('title', url))
+                    url = escape(url)
+                    lines.append(f'<p>Via <a href="{url}">{title}</a></p>')
+            lines.extend(_HTML_FOOT)
             content['type'] = 'text/html'
             content['value'] = '\n'.join(lines)
             return content
         else:  # not self.html_mail
-            if content['type'] in ('text/html', 'application/xhtml+xml'):
+            if ctype in ('text/html', 'application/xhtml+xml'):
                 try:
                     lines = [self._html2text(content['value'])]
                 except _html_parser.HTMLParseError as e:
@@ -902,32 +1130,33 @@ class Feed (object):
             else:
                 lines = [content['value']]
             lines.append('')
-            lines.append('URL: {}'.format(link))
+            lines.append(f'URL: {link}')
             for enclosure in getattr(entry, 'enclosures', []):
                 if getattr(enclosure, 'url', None):
-                    lines.append('Enclosure: {}'.format(enclosure.url))
+                    lines.append(f'Enclosure: {enclosure.url}')
                 if getattr(enclosure, 'src', None):
-                    lines.append('Enclosure: {}'.format(enclosure.src))
+                    lines.append(f'Enclosure: {enclosure.src}')
             for elink in getattr(entry, 'links', []):
                 if elink.get('rel', None) == 'via':
                     url = elink['href']
                     title = elink.get('title', url)
-                    lines.append('Via: {} {}'.format(title, url))
+                    lines.append(f'Via: {title} {url}')
             content['type'] = 'text/plain'
             content['value'] = '\n'.join(lines)
             return content
 
     def _send(self, sender, message):
-        _LOG.info('send message for {}'.format(self))
-        section = self.section
-        if section not in self.config:
-            section = 'DEFAULT'
+        _LOG.info('send message for %s', self)
         _email.send(recipient=self.to, message=message,
-                    config=self.config, section=section)
+                    config=self.config, section=self._effective_section)
 
-    def run(self, send=True, clean=False):
+    def run(self, send=True, clean=False, parsed=None):
         """Fetch and process the feed, mailing entry emails.
 
+        If `parsed` is not `None`, it is used instead of fetching the
+        feed again (e.g. when the fetch already happened via
+        `fetch_many`).
+
         >>> feed = Feed(
         ...    name='test-feed',
         ...    url='http://feeds.feedburner.com/allthingsrss/hJBr')
@@ -943,7 +1172,8 @@ class Feed (object):
         if clean:
             self.etag = None
             self.modified = None
-        parsed = self._fetch()
+        if parsed is None:
+            parsed = self._fetch()
 
         if clean and len(parsed.entries) > 0:
             for guid in self.seen:
@@ -952,8 +1182,8 @@ class Feed (object):
         if self.digest:
             digest = self._new_digest()
             seen = []
-            for (guid, state, sender, message) in self._process(parsed):
-                _LOG.debug('new message: {}'.format(message['Subject']))
+            for (guid, state, sender, message) in self._process(parsed, full=clean):
+                _LOG.debug('new message: %s', message['Subject'])
                 seen.append((guid, state))
                 self._append_to_digest(digest=digest, message=message)
             if seen:
@@ -961,18 +1191,20 @@ class Feed (object):
                     digest = self.digest_post_process(feed=self, parsed=parsed, seen=seen, message=digest)
                     if not digest:
                         return
-                _LOG.debug('new digest for {}'.format(self))
+                _LOG.debug('new digest for %s', self)
                 if send:
                     self._send_digest(digest=digest, sender=sender)
                 for (guid, state) in seen:
                     self.seen[guid] = state
+                    self.seen.move_to_end(guid)
         else:
-            for (guid, state, sender, message) in self._process(parsed):
-                _LOG.debug('new message: {}'.format(message['Subject']))
+            for (guid, state, sender, message) in self._process(parsed, full=clean):
+                _LOG.debug('new message: %s', message['Subject'])
                 if send:
                     self._send(sender=sender, message=message)
                     state['message_id'] = str(message["Message-ID"])
                 self.seen[guid] = state
+                self.seen.move_to_end(guid)
 
         self.etag = parsed.get('etag', None)
         self.modified = parsed.get('modified', None)
@@ -1006,11 +1238,17 @@ class Feed (object):
                         del self.seen[guid]
                     old = old - 1
 
+        if self.max_seen > 0:
+            # Cap the seen table so it cannot grow without bound across
+            # runs; evict the oldest entries first.
+            while len(self.seen) > self.max_seen:
+                self.seen.popitem(last=False)
+
     def _new_digest(self):
         digest = _MIMEMultipart('digest')
         digest['To'] = _formataddr(_parseaddr(self.to))  # Encodes with utf-8 as necessary
         digest['Subject'] = 'digest for {}'.format(self.name)
-        digest['Message-ID'] = '<{0}@{1}>'.format(_uuid.uuid4(), platform.node())
+        digest['Message-ID'] = _get_message_id()
         digest['User-Agent'] = self.user_agent
         digest['List-ID'] = '<{}.localhost>'.format(self.name)
         digest['List-Post'] = 'NO (posting not allowed on this list)'